@@ -0,0 +1,71 @@
+import json
+import random
+import sys
+
+# Size of the real Nobel Prize dataset (https://api.nobelprize.org/v1/prize.json)
+REAL_PRIZES = 670
+CATEGORIES = ["physics", "chemistry", "medicine", "literature", "peace", "economics"]
+
+FIRST_NAMES = [
+    "Albert", "Marie", "Niels", "Emmanuelle", "Jennifer", "Richard", "Dorothy", "Linus", "Ada", "Kazuo",
+    "Toni", "Malala", "Werner", "Barbara", "Paul", "Rosalind", "Frederick", "Gabriel", "Wangari", "Max",
+    "Ernest", "Irene", "Enrico", "Lise", "Alexander", "Tu", "Svante", "Carolyn", "Abdulrazak", "Pierre",
+]
+SURNAMES = [
+    "Einstein", "Curie", "Bohr", "Charpentier", "Doudna", "Feynman", "Hodgkin", "Pauling", "Yonath", "Ishiguro",
+    "Morrison", "Yousafzai", "Heisenberg", "McClintock", "Dirac", "Franklin", "Sanger", "Marquez", "Maathai", "Planck",
+    "Rutherford", "Joliot", "Fermi", "Meitner", "Fleming", "Youyou", "Paabo", "Bertozzi", "Gurnah", "Zeeman",
+]
+MOTIVATION_WORDS = [
+    "discovery", "development", "theoretical", "physics", "method", "genome", "editing", "structure", "atoms",
+    "radiation", "services", "contributions", "research", "chemical", "bonds", "quantum", "mechanics", "neutron",
+    "particles", "cells", "immune", "therapy", "novels", "poetry", "peace", "efforts", "human", "rights",
+    "economic", "analysis", "markets", "theory", "catalysis", "molecules", "proteins", "spectroscopy", "fusion",
+]
+
+
+# Synthetic prizes in the shape of the Nobel v1 API, scale times the size of
+# the real dataset. The same seed always yields the same data.
+def generate_prizes(scale=10, seed=1901):
+    rng = random.Random(seed)
+    count = int(REAL_PRIZES * scale)
+    laureate_id = 0
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        prize = {"year": str(1901 + i // len(CATEGORIES)), "category": category}
+        if rng.random() < 0.05:
+            prize["overallMotivation"] = "No Nobel Prize was awarded this year."
+            yield prize
+            continue
+
+        shares = rng.choice([1, 1, 2, 3])
+        laureates = []
+        for _ in range(shares):
+            laureate_id += 1
+            words = rng.sample(MOTIVATION_WORDS, rng.randint(6, 14))
+            laureates.append({
+                "id": str(laureate_id),
+                "firstname": rng.choice(FIRST_NAMES),
+                "surname": rng.choice(SURNAMES),
+                "motivation": '"for ' + " ".join(words) + '"',
+                "share": str(shares),
+            })
+        prize["laureates"] = laureates
+        yield prize
+
+
+# Write a dataset file that the data loader can read (DATA_SOURCE or python ingest.py)
+def write_dataset(path, scale=10, seed=1901):
+    with open(path, "w") as handle:
+        handle.write('{"prizes":[')
+        for i, prize in enumerate(generate_prizes(scale, seed)):
+            if i:
+                handle.write(",")
+            handle.write(json.dumps(prize))
+        handle.write("]}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m bench.dataset OUTPUT.json [SCALE]")
+    write_dataset(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,203 @@
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from bench.dataset import CATEGORIES, FIRST_NAMES, MOTIVATION_WORDS, REAL_PRIZES, SURNAMES, generate_prizes
+from ingest import ingest
+from main import create_app
+from mongo_indexes import ensure_indexes
+
+
+# MongoDB and Redis clients: local stand-ins unless real servers are given
+def make_clients(args):
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        mongo = MongoClient(args.mongo_uri)
+    else:
+        import mongomock
+        mongo = mongomock.MongoClient()
+    if args.redis_url:
+        import redis
+        cache = redis.Redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+        cache = fakeredis.FakeRedis()
+    return mongo, cache
+
+
+# App with a freshly loaded synthetic dataset and no rate limiting
+def build_app(args):
+    mongo, cache = make_clients(args)
+    config = {'INGEST_ON_START': False, 'RATELIMIT_ENABLED': False, 'MONGO_DB': args.db}
+    app = create_app(config, mongo_client=mongo, redis_client=cache, build=False)
+    services = app.extensions['nobel']
+
+    services.collection.drop()
+    cache.flushdb()
+    ensure_indexes(services.collection)
+    started = time.perf_counter()
+    result = ingest(services.collection, generate_prizes(args.scale, args.seed))
+    print(f"Loaded {result.seen} prizes (scale {args.scale}x) in {time.perf_counter() - started:.1f}s")
+    services.build_indexes()
+    return app
+
+
+def name_requests(rng, count):
+    requests = []
+    for _ in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"
+        if rng.random() < 0.3:
+            name = name[:rng.randint(3, len(name))]
+        requests.append(("GET", f"/search/name?q={quote(name)}", None))
+    return requests
+
+
+def category_requests(rng, count, pages):
+    return [("GET", f"/search/category?q={rng.choice(CATEGORIES)}&page={rng.randint(1, pages)}"
+                    f"&page_size=10&sort_by={rng.choice(['year', '-year'])}", None)
+            for _ in range(count)]
+
+
+# Keyset pages: walk each category once to collect real "next" cursors
+def keyset_requests(client, rng, count, pages):
+    cursors = []
+    for category in CATEGORIES:
+        url = f"/search/category?q={category}&page_size=10"
+        for _ in range(pages):
+            cursors.append(url)
+            cursor = client.get(url).get_json()["next"]
+            if not cursor:
+                break
+            url = f"/search/category?q={category}&page_size=10&after={cursor}"
+    return [("GET", url, None) for url in rng.sample(cursors, min(count, len(cursors)))]
+
+
+def motivation_requests(rng, count):
+    requests = []
+    for _ in range(count):
+        words = rng.sample(MOTIVATION_WORDS, rng.randint(1, 2))
+        if rng.random() < 0.3:
+            words[-1] = words[-1][:4]
+        requests.append(("GET", f"/search/motivation?q={quote(' '.join(words))}&page={rng.randint(1, 3)}", None))
+    return requests
+
+
+def batch_requests(rng, count):
+    requests = []
+    for _ in range(count):
+        queries = [{"type": "name", "q": f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"} for _ in range(5)]
+        queries += [{"type": "category", "q": rng.choice(CATEGORIES), "page": rng.randint(1, 5)} for _ in range(3)]
+        queries += [{"type": "motivation", "q": rng.choice(MOTIVATION_WORDS)} for _ in range(2)]
+        requests.append(("POST", "/search/batch", {"queries": queries}))
+    return requests
+
+
+def run_requests(client, requests, concurrency):
+    def call(request):
+        method, url, body = request
+        started = time.perf_counter()
+        response = client.open(url, method=method, json=body)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.get_data()[:200]}")
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(call, requests))
+    return latencies, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies, wall):
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "throughput_rps": len(latencies) / wall,
+    }
+
+
+# Flag results whose p99 or throughput is worse than the baseline by more
+# than tolerance (a fraction)
+def regressions(results, baseline, tolerance):
+    found = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            found.append(f"{name}: p99 {before['p99_ms']:.2f} -> {result['p99_ms']:.2f} ms")
+        if result["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            found.append(f"{name}: throughput {before['throughput_rps']:.0f} -> {result['throughput_rps']:.0f} req/s")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the search endpoints with cold and warm caches.")
+    parser.add_argument("--scale", type=float, default=10, help="dataset size as a multiple of the real data")
+    parser.add_argument("--requests", type=int, default=200, help="distinct requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1901)
+    parser.add_argument("--endpoints", default="name,category,keyset,motivation,batch")
+    parser.add_argument("--mongo-uri", help="use this MongoDB server instead of mongomock")
+    parser.add_argument("--redis-url", help="use this Redis database instead of fakeredis (it is flushed)")
+    parser.add_argument("--db", default="nobel_bench", help="MongoDB database to load (it is dropped)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression against the baseline")
+    args = parser.parse_args(argv)
+
+    app = build_app(args)
+    client = app.test_client()
+    services = app.extensions['nobel']
+    rng = random.Random(args.seed)
+    pages = max(1, int(args.scale * REAL_PRIZES / len(CATEGORIES) / 10))
+
+    workloads = {
+        "name": lambda: name_requests(rng, args.requests),
+        "category": lambda: category_requests(rng, args.requests, pages),
+        "keyset": lambda: keyset_requests(client, rng, args.requests, pages),
+        "motivation": lambda: motivation_requests(rng, args.requests),
+        "batch": lambda: batch_requests(rng, max(1, args.requests // 10)),
+    }
+
+    results = {}
+    print(f"{'endpoint':<22}{'requests':>9}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'req/s':>10}")
+    for endpoint in args.endpoints.split(","):
+        # Distinct requests, so the cold pass misses the cache on every one
+        requests = list(dict.fromkeys((method, url, json.dumps(body)) for method, url, body in workloads[endpoint]()))
+        requests = [(method, url, json.loads(body)) for method, url, body in requests]
+
+        services.redis.flushdb()
+        services.response_cache.local.clear()
+        for phase in ("cold", "warm"):
+            latencies, wall = run_requests(client, requests, args.concurrency)
+            result = results[f"{endpoint}/{phase}"] = summarize(latencies, wall)
+            print(f"{endpoint + '/' + phase:<22}{result['requests']:>9}{result['p50_ms']:>10.2f}"
+                  f"{result['p99_ms']:>10.2f}{result['mean_ms']:>10.2f}{result['throughput_rps']:>10.0f}")
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump({"scale": args.scale, "results": results}, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            found = regressions(results, json.load(handle)["results"], args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
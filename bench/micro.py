@@ -0,0 +1,99 @@
+import argparse
+import json
+import random
+import re
+import sys
+import timeit
+
+import mongomock
+from bson import ObjectId
+from rapidfuzz import process
+
+from bench.dataset import FIRST_NAMES, MOTIVATION_WORDS, SURNAMES, generate_prizes
+from laureate_index import LaureateIndex
+from laureate_table import LaureateTable
+from motivation_index import MotivationIndex
+from response_cache import decode, encode
+from serialization import dumps
+
+
+# The per-request work the original handlers did, kept as baselines
+def legacy_fuzzy(laureates, query):
+    name_list = [l['laureates']['firstname'] for l in laureates]
+    matches = process.extract(query, name_list, limit=5)
+    return [l for l in laureates if l['laureates']['firstname'] in [match[0] for match in matches]]
+
+
+def legacy_regex(laureates, query):
+    pattern = re.compile(f".*{query}.*", re.IGNORECASE)
+    return [l for l in laureates if pattern.match(l['laureates'].get('motivation') or "")]
+
+
+def legacy_convert_objectid(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, list):
+        return [legacy_convert_objectid(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: legacy_convert_objectid(value) for key, value in obj.items()}
+    return obj
+
+
+# Run fn over the queries repeatedly and return microseconds per call
+def measure(fn, queries, repeat):
+    calls = iter(queries * (repeat // len(queries) + 1))
+    seconds = min(timeit.repeat(lambda: fn(next(calls)), number=max(1, repeat // 5), repeat=5))
+    return seconds / max(1, repeat // 5) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the fuzzy match, text search and serialization paths.")
+    parser.add_argument("--scale", type=float, default=10, help="dataset size as a multiple of the real data")
+    parser.add_argument("--repeat", type=int, default=50, help="calls per benchmark")
+    parser.add_argument("--seed", type=int, default=1901)
+    parser.add_argument("--skip-legacy", action="store_true", help="skip the slow baselines of the original code")
+    args = parser.parse_args(argv)
+
+    collection = mongomock.MongoClient().db.prizes
+    collection.insert_many(list(generate_prizes(args.scale, args.seed)))
+    laureates = list(collection.aggregate([{"$unwind": "$laureates"}]))
+    table = LaureateTable.load(collection)
+    name_index = LaureateIndex()
+    name_index.build(table)
+    motivation_index = MotivationIndex()
+    motivation_index.build(table)
+    print(f"{len(laureates)} laureates (scale {args.scale}x)")
+
+    rng = random.Random(args.seed)
+    names = [f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}" for _ in range(64)]
+    words = [" ".join(rng.sample(MOTIVATION_WORDS, 2)) for _ in range(64)]
+    single_words = [rng.choice(MOTIVATION_WORDS) for _ in range(64)]
+    pages = [laureates[i:i + 50] for i in range(0, min(len(laureates), 50 * 64), 50)]
+    bodies = [dumps(page) for page in pages]
+
+    benchmarks = [
+        ("fuzzy: index match", lambda q: name_index.search(q), names),
+        ("fuzzy: batch cdist (per name)", lambda q: name_index.search_many(names[:32]), [None]),
+        ("text: inverted index, 2 terms", lambda q: motivation_index.search(q), words),
+        ("text: inverted index, 1 term", lambda q: motivation_index.search(q), single_words),
+        ("serialize: encoder, 50 docs", dumps, pages),
+        ("cache: encode+decode, 50 docs", lambda body: decode(encode(body, 1024)), bodies),
+    ]
+    if not args.skip_legacy:
+        benchmarks += [
+            ("fuzzy: legacy extract+filter", lambda q: legacy_fuzzy(laureates, q), names),
+            ("text: legacy regex scan", lambda q: legacy_regex(laureates, q), single_words),
+            ("serialize: legacy convert+dumps", lambda page: json.dumps(legacy_convert_objectid(page)), pages),
+        ]
+
+    print(f"{'benchmark':<36}{'us/call':>12}{'calls/s':>12}")
+    for name, fn, queries in benchmarks:
+        micros = measure(fn, queries, args.repeat)
+        if name.startswith("fuzzy: batch cdist"):
+            micros /= 32
+        print(f"{name:<36}{micros:>12.1f}{1e6 / micros:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import os
+
+
+# Application settings, read from environment variables
+def from_env():
+    return {
+        # MongoDB connection and pool
+        'MONGO_HOST': os.getenv('MONGO_HOST', 'localhost'),
+        'MONGO_PORT': int(os.getenv('MONGO_PORT', 27017)),
+        'MONGO_DB': os.getenv('MONGO_DB', 'nobel_db'),
+        'MONGO_MAX_POOL_SIZE': int(os.getenv('MONGO_MAX_POOL_SIZE', 100)),
+        'MONGO_MIN_POOL_SIZE': int(os.getenv('MONGO_MIN_POOL_SIZE', 0)),
+        'MONGO_CONNECT_TIMEOUT_MS': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        'MONGO_SOCKET_TIMEOUT_MS': int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 10000)),
+        'MONGO_SERVER_SELECTION_TIMEOUT_MS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+
+        # Redis connection and pool
+        'REDIS_HOST': os.getenv('REDIS_HOST', 'localhost'),
+        'REDIS_PORT': int(os.getenv('REDIS_PORT', 6379)),
+        'REDIS_DB': int(os.getenv('REDIS_DB', 0)),
+        'REDIS_MAX_CONNECTIONS': int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),
+        'REDIS_SOCKET_TIMEOUT': float(os.getenv('REDIS_SOCKET_TIMEOUT', 1.0)),
+        'REDIS_CONNECT_TIMEOUT': float(os.getenv('REDIS_CONNECT_TIMEOUT', 1.0)),
+
+        # Response cache
+        'CACHE_TTL': int(os.getenv('CACHE_TTL', 300)),
+        'CACHE_LOCAL_SIZE': int(os.getenv('CACHE_LOCAL_SIZE', 1024)),
+        'CACHE_LOCAL_TTL': int(os.getenv('CACHE_LOCAL_TTL', 30)),
+        'CACHE_COMPRESS_MIN_SIZE': int(os.getenv('CACHE_COMPRESS_MIN_SIZE', 1024)),
+
+        # Data loading
+        'DATA_SOURCE': os.getenv('DATA_SOURCE', 'https://api.nobelprize.org/v1/prize.json'),
+        'INGEST_ON_START': os.getenv('INGEST_ON_START', 'true').lower() == 'true',
+        'INGEST_BATCH_SIZE': int(os.getenv('INGEST_BATCH_SIZE', 500)),
+        'INGEST_LOCK_TIMEOUT': int(os.getenv('INGEST_LOCK_TIMEOUT', 600)),
+        'DATA_VERSION_CHECK_INTERVAL': float(os.getenv('DATA_VERSION_CHECK_INTERVAL', 5)),
+
+        # Log MongoDB commands slower than this many milliseconds (0 disables)
+        'SLOW_QUERY_MS': float(os.getenv('SLOW_QUERY_MS', 0)),
+
+        # Batch search
+        'BATCH_MAX_QUERIES': int(os.getenv('BATCH_MAX_QUERIES', 50)),
+        'BATCH_WORKERS': int(os.getenv('BATCH_WORKERS', 8)),
+
+        # Rate limiter storage, shared between workers when pointed at Redis
+        'RATELIMIT_STORAGE_URI': os.getenv('RATELIMIT_STORAGE_URI', 'memory://'),
+    }
@@ -0,0 +1,23 @@
+import multiprocessing
+import os
+
+# Gunicorn settings for the production server: `gunicorn -c gunicorn.conf.py wsgi:app`
+bind = os.getenv('BIND', '0.0.0.0:4000')
+workers = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 4))
+timeout = int(os.getenv('WEB_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('WEB_KEEPALIVE', 5))
+
+# Build the app in each worker after the fork so every worker gets its own
+# MongoDB and Redis connection pools
+preload_app = False
+
+
+# With PROMETHEUS_MULTIPROC_DIR set, metrics are aggregated across workers;
+# drop the live gauges of workers that exit
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
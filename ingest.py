@@ -0,0 +1,244 @@
+import codecs
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+
+import redis
+import requests
+from pymongo import ReplaceOne
+
+from mongo_indexes import ensure_indexes
+
+# Redis keys shared by every worker
+VERSION_KEY = "nobel:data_version"
+LOCK_KEY = "nobel:ingest_lock"
+
+CHUNK_SIZE = 64 * 1024
+
+_ARRAY_START = re.compile(r'"prizes"\s*:\s*\[')
+_WHITESPACE = " \t\r\n"
+
+
+# Yield raw byte chunks from an HTTP(S) URL or a local file path
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    if source.startswith(("http://", "https://")):
+        with requests.get(source, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+    else:
+        with open(source, "rb") as handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+
+# Incrementally parse the top-level "prizes" array, yielding one prize at a
+# time so the whole document is never held in memory
+def iter_prizes(chunks):
+    chunks = iter(chunks)
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+
+    def read_more():
+        nonlocal buffer, pos
+        for chunk in chunks:
+            if chunk:
+                buffer = buffer[pos:] + text.decode(chunk)
+                pos = 0
+                return True
+        return False
+
+    while True:
+        match = _ARRAY_START.search(buffer, pos)
+        if match:
+            pos = match.end()
+            break
+        if not read_more():
+            raise ValueError('No "prizes" array found in data source')
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE + ",":
+            pos += 1
+        if pos == len(buffer):
+            if not read_more():
+                raise ValueError("Unexpected end of data source")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            prize, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not read_more():
+                raise
+            continue
+        yield prize
+
+
+# Stable hash of a prize's content, stored with the document as _hash
+def content_hash(prize):
+    return hashlib.sha1(json.dumps(prize, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+# Summary of one ingest run
+class IngestResult:
+    def __init__(self):
+        self.seen = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.categories = set()
+
+    @property
+    def changed(self):
+        return self.inserted + self.updated > 0
+
+    def __str__(self):
+        return (f"{self.seen} prizes read: {self.inserted} inserted, {self.updated} updated, "
+                f"{self.unchanged} unchanged")
+
+
+# Upsert prizes keyed by (year, category) in bounded bulk_write batches,
+# skipping documents whose content hash has not changed
+def ingest(collection, prizes, batch_size=500):
+    result = IngestResult()
+    existing = {(doc.get("year"), doc.get("category")): doc.get("_hash")
+                for doc in collection.find({}, {"_id": 0, "year": 1, "category": 1, "_hash": 1})}
+
+    operations = []
+
+    def flush():
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+            operations.clear()
+
+    for prize in prizes:
+        result.seen += 1
+        key = (prize.get("year"), prize.get("category"))
+        digest = content_hash(prize)
+        if existing.get(key) == digest:
+            result.unchanged += 1
+            continue
+
+        if key in existing:
+            result.updated += 1
+        else:
+            result.inserted += 1
+        existing[key] = digest
+        result.categories.add(prize.get("category"))
+
+        operations.append(ReplaceOne({"year": key[0], "category": key[1]}, dict(prize, _hash=digest), upsert=True))
+        if len(operations) >= batch_size:
+            flush()
+    flush()
+    return result
+
+
+# Cache key prefixes whose entries may be stale after an ingest
+def affected_cache_prefixes(result):
+    prefixes = ["name:", "motivation:", "facet:"]
+    prefixes.extend(f"category:{category}:" for category in sorted(result.categories) if category)
+    return prefixes
+
+
+def get_data_version(services):
+    try:
+        return int(services.redis.get(VERSION_KEY) or 0)
+    except redis.RedisError:
+        return None
+
+
+# Ingest the data source once across all workers. The worker holding the
+# Redis lock writes the changes, bumps the data version so other workers
+# follow, rebuilds its own indexes and invalidates affected cache entries.
+def run_ingest(services, source=None):
+    config = services.config
+    source = source or config['DATA_SOURCE']
+    lock = services.redis.lock(LOCK_KEY, timeout=config['INGEST_LOCK_TIMEOUT'], blocking=False)
+    try:
+        if not lock.acquire():
+            print("Another worker is loading the data. Skipping data load.")
+            return None
+    except redis.RedisError as e:
+        print(f"Could not take the ingest lock, loading anyway: {e}")
+        lock = None
+    try:
+        collection = services.collection
+        ensure_indexes(collection)
+        result = ingest(collection, iter_prizes(read_chunks(source)), config['INGEST_BATCH_SIZE'])
+        print(f"Loaded data from {source}: {result}")
+        if result.changed:
+            # Name and motivation results are cached under the version of the
+            # indexes that produced them, so the version is bumped before the
+            # rebuild and only adopted once the new indexes are in place
+            version = services.data_version
+            try:
+                version = services.redis.incr(VERSION_KEY)
+            except redis.RedisError as e:
+                print(f"Could not publish the new data version: {e}")
+            services.building_version = version
+            services.build_indexes()
+            services.data_version = version
+            services.response_cache.invalidate(*affected_cache_prefixes(result))
+        return result
+    finally:
+        if lock is not None:
+            try:
+                lock.release()
+            except redis.RedisError:
+                pass
+
+
+# Run the ingest in a daemon thread so startup does not wait for the download
+def start_background_ingest(services, source=None):
+    def target():
+        try:
+            run_ingest(services, source)
+        except Exception as e:
+            print(f"Error loading data: {e}")
+
+    thread = threading.Thread(target=target, name="ingest", daemon=True)
+    thread.start()
+    return thread
+
+
+# Rebuild this worker's indexes and drop its local cache tier when another
+# worker has changed the data. Checks Redis at most once per interval and
+# rebuilds in the background so the request is not held up. Until the
+# rebuild finishes the worker keeps caching under its old data version, so
+# results from its old indexes are never read by workers already on the new
+# version.
+def refresh_if_stale(services):
+    now = time.monotonic()
+    if now - services.version_checked_at < services.config['DATA_VERSION_CHECK_INTERVAL']:
+        return
+    services.version_checked_at = now
+
+    version = get_data_version(services)
+    if version is None or version in (services.data_version, services.building_version):
+        return
+    services.building_version = version
+    services.response_cache.local.clear()
+
+    def rebuild():
+        services.build_indexes()
+        services.data_version = version
+
+    threading.Thread(target=rebuild, name="rebuild-indexes", daemon=True).start()
+
+
+if __name__ == "__main__":
+    import config as settings
+    from services import Services
+
+    services = Services(settings.from_env())
+    try:
+        run_ingest(services, sys.argv[1] if len(sys.argv) > 1 else None)
+    finally:
+        services.close()
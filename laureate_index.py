@@ -0,0 +1,92 @@
+import numpy as np
+from rapidfuzz import process, fuzz, utils
+
+from laureate_table import LaureateTable
+from serialization import project
+
+
+# Immutable snapshot of the index, swapped in atomically on rebuild: the
+# laureate table it was built from and, per name column, its distinct names
+# and the index of each position's name
+class _Columns:
+    __slots__ = ("table", "choices")
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else LaureateTable()
+        self.choices = []
+
+
+# Preprocess a name column once and collapse repeated names. Returns the
+# distinct processed names and, for each position, the index of its name.
+def _distinct_names(names):
+    processed = [utils.default_process(name) for name in names]
+    distinct = list(dict.fromkeys(processed))
+    lookup = {name: i for i, name in enumerate(distinct)}
+    return distinct, np.fromiter((lookup[name] for name in processed), dtype=np.intp, count=len(processed))
+
+
+# In-process name index over the positions of a LaureateTable
+class LaureateIndex:
+    def __init__(self):
+        self._columns = _Columns()
+
+    def __len__(self):
+        return len(self._columns.table)
+
+    # Build the index from a laureate table (once per data change)
+    def build(self, table):
+        columns = _Columns(table)
+        full_names, first_names, surnames = [], [], []
+        for laureate in table.laureates:
+            firstname = laureate.get("firstname") or ""
+            surname = laureate.get("surname") or ""
+            first_names.append(firstname)
+            surnames.append(surname)
+            full_names.append(f"{firstname} {surname}".strip())
+
+        columns.choices = [_distinct_names(names) for names in (full_names, first_names, surnames)]
+        self._columns = columns
+        return len(table)
+
+    # Fuzzy match several names against the full name, first name and
+    # surname columns with one cdist call per column. Returns, per query,
+    # (position, score) pairs ordered by best score. Each distinct name is
+    # scored once, then scores are spread back to every position. Queries
+    # are scored in slices to bound the size of the matrix.
+    @staticmethod
+    def _match_many(columns, queries, limit, slice_size=32):
+        count = len(columns.table)
+        if not count:
+            return [[] for _ in queries]
+
+        k = min(limit, count)
+        matches = []
+        for start in range(0, len(queries), slice_size):
+            chunk = [utils.default_process(query) for query in queries[start:start + slice_size]]
+            workers = -1 if len(chunk) > 1 else 1
+            scores = None
+            for distinct, positions in columns.choices:
+                matrix = process.cdist(chunk, distinct, scorer=fuzz.WRatio, workers=workers)[:, positions]
+                scores = matrix if scores is None else np.maximum(scores, matrix)
+
+            for query, row in zip(chunk, scores):
+                if not query:
+                    matches.append([])
+                    continue
+                top = np.argpartition(-row, k - 1)[:k]
+                ranked = sorted(top.tolist(), key=lambda position: (-row[position], position))
+                matches.append([(position, float(row[position])) for position in ranked])
+        return matches
+
+    # Fuzzy match a name and return the matching unwound prize documents,
+    # projected to the given fields tree (see serialization.parse_fields)
+    def search(self, query, limit=5, fields=None):
+        return self.search_many([query], limit, [fields])[0]
+
+    # search() for several names in one pass; fields is a list of
+    # projection trees aligned with queries
+    def search_many(self, queries, limit=5, fields=None):
+        columns = self._columns
+        fields = fields or [None] * len(queries)
+        return [[project(columns.table.document(position), tree) for position, _ in matches]
+                for matches, tree in zip(self._match_many(columns, queries, limit), fields)]
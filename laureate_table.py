@@ -0,0 +1,44 @@
+import numpy as np
+
+
+# Every laureate of every prize, stored as columns rather than one unwound
+# document per laureate: each prize once (without its laureates), each
+# laureate record once, and per laureate position a reference to its prize.
+# Loaded with one scan per data change and never modified afterwards.
+class LaureateTable:
+    __slots__ = ("prizes", "prize_refs", "laureates")
+
+    def __init__(self):
+        self.prizes = []
+        self.prize_refs = np.empty(0, dtype=np.intp)
+        self.laureates = []
+
+    def __len__(self):
+        return len(self.laureates)
+
+    @classmethod
+    def load(cls, collection):
+        table = cls()
+        refs = []
+        for prize in collection.find({}, {"_hash": 0}):
+            laureates = prize.get("laureates")
+            if laureates is None:
+                continue
+            if not isinstance(laureates, list):
+                laureates = [laureates]
+            if not laureates:
+                continue
+            # Keep the key in place so documents come out in the stored order
+            prize["laureates"] = None
+            refs.extend([len(table.prizes)] * len(laureates))
+            table.laureates.extend(laureates)
+            table.prizes.append(prize)
+        table.prize_refs = np.array(refs, dtype=np.intp)
+        return table
+
+    # The unwound prize document of the laureate at position (as $unwind
+    # would return it), assembled in O(1)
+    def document(self, position):
+        document = dict(self.prizes[self.prize_refs[position]])
+        document["laureates"] = self.laureates[position]
+        return document
@@ -1,194 +1,422 @@
-import os
-import requests
-from flask import Flask, request, jsonify
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
-from bson.regex import Regex
+import base64
+import binascii
+import json
+from contextvars import copy_context
+from flask import Flask, Blueprint, Response, current_app, request, jsonify
 from bson import ObjectId
-from rapidfuzz import process
-import redis
+from bson.errors import InvalidId
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_swagger_ui import get_swaggerui_blueprint
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Get Redis and MongoDB host and port from environment variables
-redis_host = os.getenv('REDIS_HOST', 'localhost')
-redis_port = int(os.getenv('REDIS_PORT', 6379))
-
-mongo_host = os.getenv('MONGO_HOST', 'localhost')
-mongo_port = int(os.getenv('MONGO_PORT', 27017))
-
-# Initialize Redis client for caching
-cache = redis.Redis(host=redis_host, port=redis_port, db=0)
-
-# Initialize MongoDB client (connect to MongoDB via service name or localhost)
-client = MongoClient(f"mongodb://{mongo_host}:{mongo_port}")
-db = client['nobel_db']  # Database name
-collection = db['prizes']  # Collection name
-
-# Limiter to rate limit the API requests
+import config as settings
+import metrics
+from metrics import SEARCH_ERRORS, stage
+from ingest import get_data_version, refresh_if_stale, start_background_ingest
+from mongo_indexes import SORT_FIELDS, ensure_indexes
+from response_cache import make_key, normalize_query
+from serialization import MongoJSONProvider, dumps, fields_key, mongo_projection, parse_fields
+from services import Services
+
+# Limiter to rate limit the API requests (storage is set by RATELIMIT_STORAGE_URI)
 limiter = Limiter(
     get_remote_address,
-    app=app,
     default_limits=["200 per day", "50 per hour"]
 )
 
+# Search routes, registered on every app built by create_app
+search = Blueprint('search', __name__)
+
 # Swagger UI setup
 SWAGGER_URL = '/swagger'
 API_URL = '/static/swagger.json'  # Path to your swagger.json file
-swaggerui_blueprint = get_swaggerui_blueprint(SWAGGER_URL, API_URL, config={'app_name': "Nobel Prize API"})
-app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
 
-# Utility function to convert ObjectId to string
-def convert_objectid(obj):
-    if isinstance(obj, ObjectId):
-        return str(obj)
-    if isinstance(obj, list):
-        return [convert_objectid(item) for item in obj]
-    if isinstance(obj, dict):
-        return {key: convert_objectid(value) for key, value in obj.items()}
-    return obj
+# Create the Flask app. MongoDB and Redis clients can be passed in; otherwise
+# each worker process creates its own pooled clients on first use. Indexes are
+# built from what is already stored, and the data source is loaded in the
+# background unless INGEST_ON_START is off.
+def create_app(config=None, mongo_client=None, redis_client=None, build=True):
+    app = Flask(__name__)
+    app.json = MongoJSONProvider(app)
+    app.config.update(settings.from_env())
+    if config:
+        app.config.update(config)
 
+    services = Services(app.config, mongo_client, redis_client)
+    app.extensions['nobel'] = services
 
-# Load Nobel Prize data into MongoDB
-def load_data():
-    try:
-        url = "https://api.nobelprize.org/v1/prize.json"
-        response = requests.get(url)
-        data = response.json()
-
-        # Insert data into MongoDB only if the collection is empty
-        if collection.count_documents({}) == 0:
-            collection.insert_many(data["prizes"])
-            print(f"Loaded {len(data['prizes'])} prizes into MongoDB.")
-        else:
-            print("Data already loaded into MongoDB. Skipping data load.")
-    except Exception as e:
-        print(f"Error loading data: {e}")
+    limiter.init_app(app)
+    metrics.init_app(app)
 
+    swaggerui_blueprint = get_swaggerui_blueprint(SWAGGER_URL, API_URL, config={'app_name': "Nobel Prize API"})
+    app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+    app.register_blueprint(search)
 
-# Root route
-@app.route('/')
-def index():
-    return jsonify({"message": "Welcome to the Nobel Prize Search API!"})
+    # Flask sends whatever a before_request hook returns as the response, so
+    # this one never returns a value
+    def check_data_version():
+        refresh_if_stale(services)
 
+    app.before_request(check_data_version)
 
-# Caching function
-def cache_result(key, value, expiration=300):
-    cache.setex(key, expiration, jsonify(value).data)
+    if build:
+        try:
+            ensure_indexes(services.collection)
+        except Exception as e:
+            print(f"Error checking MongoDB indexes: {e}")
+        services.data_version = get_data_version(services) or 0
+        services.build_indexes()
+    if app.config['INGEST_ON_START']:
+        start_background_ingest(services)
 
+    return app
 
-def get_cached_result(key):
-    cached_result = cache.get(key)
-    if cached_result:
-        return jsonify(eval(cached_result))
-    return None
 
+# Services (clients, cache, indexes) of the current app
+def get_services():
+    return current_app.extensions['nobel']
 
-# Search by name with partial/fuzzy matching
-@app.route('/search/name', methods=['GET'])
-@limiter.limit("10 per minute")  # Rate limiting
-def search_by_name():
-    query = request.args.get('q', '')
-    cache_key = f"name:{query}"
 
-    # Check if the result is already cached
-    cached_result = get_cached_result(cache_key)
-    if cached_result:
-        return cached_result
+# True when the client asked for a streamed NDJSON response
+def wants_stream():
+    return request.args.get('format', 'json').lower() == 'ndjson'
 
-    try:
-        laureates = collection.aggregate([{"$unwind": "$laureates"}])
-        laureate_list = list(laureates)
-        name_list = [l['laureates']['firstname'] for l in laureate_list]
 
-        # Fuzzy match with RapidFuzz
-        matches = process.extract(query, name_list, limit=5)
+# Stream documents as newline-delimited JSON, serializing one at a time
+def ndjson_response(documents, headers=None):
+    def generate():
+        for document in documents:
+            yield dumps(document) + b"\n"
 
-        # Filter based on fuzzy matching
-        matched_laureates = [l for l in laureate_list if l['laureates']['firstname'] in [match[0] for match in matches]]
-        result = convert_objectid(matched_laureates)
+    return Response(generate(), mimetype='application/x-ndjson', headers=headers)
 
-        # Cache the result
-        cache_result(cache_key, result)
 
-        return jsonify(result)
-    except Exception as e:
-        print(f"Error during MongoDB query for name: {e}")
-        return jsonify({"error": str(e)}), 500
+# Opaque keyset pagination cursor: the sort key and _id of the last document
+def encode_cursor(doc):
+    value = json.dumps([doc.get("year"), str(doc["_id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii").rstrip("=")
 
 
-# Search by category with pagination and sorting
-@app.route('/search/category', methods=['GET'])
-@limiter.limit("10 per minute")
-def search_by_category():
-    category = request.args.get('q', '')
-    page = int(request.args.get('page', 1))
-    page_size = int(request.args.get('page_size', 10))
-    sort_by = request.args.get('sort_by', 'year')
+# The year goes straight into the MongoDB filter, so it must be a plain
+# value (as encode_cursor writes it) and never an operator document
+def decode_cursor(token):
+    try:
+        year, object_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if isinstance(year, bool) or not isinstance(year, (str, int, type(None))):
+            raise ValueError(year)
+        return year, ObjectId(object_id)
+    except (ValueError, TypeError, binascii.Error, InvalidId):
+        raise ValueError("Invalid 'after' cursor")
 
-    cache_key = f"category:{category}:{page}:{page_size}:{sort_by}"
 
-    # Check if the result is already cached
-    cached_result = get_cached_result(cache_key)
-    if cached_result:
-        return cached_result
+# Number of prizes per category, computed in one aggregation and cached
+def category_counts(services):
+    collection = services.collection
 
-    try:
-        prizes = collection.find({"category": category}, {"_id": 0, "laureates": 1, "year": 1, "category": 1}) \
-            .sort(sort_by).skip((page - 1) * page_size).limit(page_size)
-        result = convert_objectid(list(prizes))
+    def load():
+        with stage("mongo_query"):
+            counts = list(collection.aggregate([{"$group": {"_id": "$category", "count": {"$sum": 1}}}]))
+        return {item["_id"]: item["count"] for item in counts if item["_id"] is not None}
 
-        # Cache the result
-        cache_result(cache_key, result)
+    return json.loads(services.response_cache.get_or_load("facet:category", load))
 
-        return jsonify(result)
-    except Exception as e:
-        print(f"Error during MongoDB query for category: {e}")
-        return jsonify({"error": str(e)}), 500
 
+# Root route
+@search.route('/')
+def index():
+    return jsonify({"message": "Welcome to the Nobel Prize Search API!"})
 
-# Search by motivation (description)
-@app.route('/search/motivation', methods=['GET'])
-@limiter.limit("10 per minute")
-def search_by_motivation():
-    query = request.args.get('q', '')
-    regex_query = Regex(f".*{query}.*", "i")  # Case-insensitive regex match
-    cache_key = f"motivation:{query}"
 
-    # Check if the result is already cached
-    cached_result = get_cached_result(cache_key)
-    if cached_result:
-        return cached_result
+# Serve a cached response body, loading and caching it on a miss
+def cached_response(key, loader):
+    body = get_services().response_cache.get_or_load(key, loader)
+    return current_app.response_class(body, mimetype='application/json')
+
+
+# Cache hit/miss counters
+@search.route('/cache/stats')
+def cache_stats():
+    return jsonify(get_services().response_cache.stats())
+
+
+# Prometheus metrics
+@search.route('/metrics')
+@limiter.exempt
+def prometheus_metrics():
+    body, content_type = metrics.render_latest()
+    return current_app.response_class(body, content_type=content_type)
+
+
+# A parsed search request: its cache key, a loader for the cached (JSON)
+# form and a streamer for the NDJSON form. Built from request.args or from
+# one entry of a batch request; invalid parameters raise ValueError.
+class SearchPlan:
+    def __init__(self, kind, key, load, stream, query=None, fields=None):
+        self.kind = kind
+        self.key = key
+        self.load = load
+        self.stream = stream
+        self.query = query
+        self.fields = fields
+
+
+# Parameter helpers for the planners. Values come from the query string
+# (always strings) or from a batch entry (any JSON value), so anything of the
+# wrong type, null included, raises ValueError like any other invalid
+# parameter.
+def str_param(params, name, default=None):
+    if name not in params:
+        return default
+    value = params[name]
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+def int_param(params, name, default):
+    value = params.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+# Fuzzy match with RapidFuzz against the in-memory laureate index. Results
+# from the in-memory indexes are cached under the data version they were
+# built from (see ingest.refresh_if_stale).
+def name_search(services, params):
+    name_index = services.name_index
+    query = normalize_query(str_param(params, 'q', ''))
+    fields = parse_fields(params.get('fields'))
+
+    def load():
+        with stage("fuzzy_match"):
+            return name_index.search(query, limit=5, fields=fields)
+
+    def stream():
+        return load(), None
+
+    cache_key = make_key("name", services.data_version, query, fields_key(fields))
+    return SearchPlan("name", cache_key, load, stream, query, fields)
+
+
+# Category search, paged by number (page) or by the opaque cursor returned as
+# "next" (after), which avoids skipping over earlier documents
+def category_search(services, params):
+    collection = services.collection
+    category = normalize_query(str_param(params, 'q', ''))
+    page = int_param(params, 'page', 1)
+    page_size = int_param(params, 'page_size', 10)
+    sort_by = str_param(params, 'sort_by', 'year')
+    after = str_param(params, 'after')
+    paged = 'page' in params or 'page_size' in params
+
+    sort = SORT_FIELDS.get(sort_by)
+    if sort is None:
+        raise ValueError(f"sort_by must be one of: {', '.join(SORT_FIELDS)}")
+    if page < 1 or page_size < 1:
+        raise ValueError("page and page_size must be positive")
+    fields = parse_fields(params.get('fields'))
+
+    query = {"category": category}
+    if after:
+        year, object_id = decode_cursor(after)
+        op = "$gt" if sort[0][1] > 0 else "$lt"
+        query["$or"] = [{"year": {op: year}}, {"year": year, "_id": {op: object_id}}]
+
+    # _id and year are always fetched to build the next cursor, and dropped
+    # again unless requested
+    if fields is None:
+        projection = {"laureates": 1, "year": 1, "category": 1}
+    else:
+        projection = dict(mongo_projection(fields), year=1)
+
+    def find():
+        prizes = collection.find(query, projection).sort(sort)
+        if not after:
+            prizes = prizes.skip((page - 1) * page_size)
+        return prizes
+
+    def trim(prize):
+        if fields is None or "_id" not in fields:
+            prize.pop("_id")
+        if fields is not None and "year" not in fields:
+            prize.pop("year", None)
+        return prize
+
+    def load():
+        with stage("mongo_query"):
+            prizes = list(find().limit(page_size + 1))
+        next_cursor = encode_cursor(prizes[page_size - 1]) if len(prizes) > page_size else None
+        results = [trim(prize) for prize in prizes[:page_size]]
+        return {"results": results, "total": category_counts(services).get(category, 0), "next": next_cursor}
+
+    # Streams the whole category unless page or page_size is given
+    def stream():
+        prizes = find().limit(page_size) if paged else find()
+        headers = {"X-Total-Count": str(category_counts(services).get(category, 0))}
+        return (trim(prize) for prize in prizes), headers
+
+    cache_key = make_key("category", category, after or page, page_size, sort_by, fields_key(fields))
+    return SearchPlan("category", cache_key, load, stream, category, fields)
+
+
+# Motivation search: every query term must match (as a whole word or word
+# prefix) and results are BM25-ranked
+def motivation_search(services, params):
+    motivation_index = services.motivation_index
+    query = normalize_query(str_param(params, 'q', ''))
+    page = int_param(params, 'page', 1)
+    page_size = int_param(params, 'page_size', 10)
+    prefix = str(params.get('prefix', 'true')).lower() != 'false'
+    paged = 'page' in params or 'page_size' in params
+    if page < 1 or page_size < 1:
+        raise ValueError("page and page_size must be positive")
+    fields = parse_fields(params.get('fields'))
+
+    def load():
+        with stage("index_search"):
+            total, laureates = motivation_index.search(query, page=page, page_size=page_size,
+                                                       prefix=prefix, fields=fields)
+        return {"results": laureates, "total": total}
+
+    # Streams every match unless page or page_size is given
+    def stream():
+        limit = page_size if paged else None
+        total, laureates = motivation_index.iter_search(query, (page - 1) * page_size, limit, prefix, fields)
+        return laureates, {"X-Total-Count": str(total)}
+
+    cache_key = make_key("motivation", services.data_version, query, page, page_size, prefix, fields_key(fields))
+    return SearchPlan("motivation", cache_key, load, stream, query, fields)
+
+
+# Run a search from the request query string, as cached JSON or streamed NDJSON
+def run_search(planner):
+    try:
+        plan = planner(get_services(), request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
-        laureates = collection.aggregate([
-            {"$unwind": "$laureates"},
-            {"$match": {"laureates.motivation": regex_query}},
-            {"$project": {"laureates": 1, "year": 1, "category": 1}}
-        ])
+        if wants_stream():
+            documents, headers = plan.stream()
+            return ndjson_response(documents, headers)
+        return cached_response(plan.key, plan.load)
+    except Exception as e:
+        SEARCH_ERRORS.labels(plan.kind).inc()
+        print(f"Error during MongoDB query for {plan.kind}: {e}")
+        return jsonify({"error": str(e)}), 500
 
-        result = convert_objectid(list(laureates))
 
-        # Cache the result
-        cache_result(cache_key, result)
+# Search by name with partial/fuzzy matching
+@search.route('/search/name', methods=['GET'])
+@limiter.limit("10 per minute")  # Rate limiting
+def search_by_name():
+    return run_search(name_search)
+
+
+# Search by category with pagination and sorting
+@search.route('/search/category', methods=['GET'])
+@limiter.limit("10 per minute")
+def search_by_category():
+    return run_search(category_search)
 
-        return jsonify(result)
-    except Exception as e:
-        print(f"Error during MongoDB query for motivation: {e}")
-        return jsonify({"error": str(e)}), 500
+
+# Search by motivation (description) with relevance ranking and pagination
+@search.route('/search/motivation', methods=['GET'])
+@limiter.limit("10 per minute")
+def search_by_motivation():
+    return run_search(motivation_search)
+
+
+# Query types accepted by the batch endpoint
+BATCH_PLANNERS = {
+    "name": name_search,
+    "category": category_search,
+    "motivation": motivation_search,
+}
+
+
+# Resolve distinct plans to response bodies: cache hits in one lookup, name
+# misses in one fuzzy match pass, other misses in parallel on the thread pool.
+# Returns {cache key: body bytes or the exception raised while loading}.
+def run_batch(services, plans):
+    cache = services.response_cache
+    bodies = cache.get_many(list(plans))
+    misses = [plan for key, plan in plans.items() if key not in bodies]
+
+    # Each task runs in a copy of the request context so its stages are
+    # attributed to the batch route
+    futures = {plan.key: services.executor.submit(copy_context().run, cache.get_or_load, plan.key, plan.load, False)
+               for plan in misses if plan.kind != "name"}
+
+    names = [plan for plan in misses if plan.kind == "name"]
+    if names:
+        try:
+            with stage("fuzzy_match"):
+                results = services.name_index.search_many([plan.query for plan in names], 5,
+                                                          [plan.fields for plan in names])
+            for plan, documents in zip(names, results):
+                bodies[plan.key] = cache.get_or_load(plan.key, lambda documents=documents: documents, False)
+        except Exception as e:
+            for plan in names:
+                bodies[plan.key] = e
+
+    for key, future in futures.items():
+        try:
+            bodies[key] = future.result()
+        except Exception as e:
+            bodies[key] = e
+    return bodies
+
+
+# Run several name/category/motivation searches in one request. Each query is
+# an object with a "type" and the same parameters as its GET endpoint, e.g.
+# {"queries": [{"type": "name", "q": "curie"}, {"type": "category", "q": "physics", "page_size": 5}]}
+@search.route('/search/batch', methods=['POST'])
+@limiter.limit("10 per minute")
+def search_batch():
+    services = get_services()
+    payload = request.get_json(silent=True)
+    queries = payload.get('queries') if isinstance(payload, dict) else None
+    if not isinstance(queries, list) or not queries:
+        return jsonify({"error": "Request body must be a JSON object with a non-empty 'queries' list"}), 400
+    if len(queries) > current_app.config['BATCH_MAX_QUERIES']:
+        return jsonify({"error": f"At most {current_app.config['BATCH_MAX_QUERIES']} queries per batch"}), 400
+
+    plans = []
+    for item in queries:
+        try:
+            kind = item.get('type') if isinstance(item, dict) else None
+            planner = BATCH_PLANNERS.get(kind) if isinstance(kind, str) else None
+            if planner is None:
+                raise ValueError(f"type must be one of: {', '.join(BATCH_PLANNERS)}")
+            plans.append(planner(services, item))
+        except ValueError as e:
+            plans.append(e)
+
+    # Identical queries share one cache key and are resolved once
+    bodies = run_batch(services, {plan.key: plan for plan in plans if isinstance(plan, SearchPlan)})
+
+    # Cached bodies are spliced into the response as-is, without decoding
+    results = []
+    for item, plan in zip(queries, plans):
+        outcome = bodies[plan.key] if isinstance(plan, SearchPlan) else plan
+        if isinstance(outcome, bytes):
+            results.append(b'{"query":' + dumps(item) + b',"result":' + outcome + b'}')
+        else:
+            if isinstance(plan, SearchPlan):
+                SEARCH_ERRORS.labels(plan.kind).inc()
+                print(f"Error during batch query for {plan.kind}: {outcome}")
+            results.append(dumps({"query": item, "error": str(outcome)}))
+    body = b'{"results":[' + b','.join(results) + b']}'
+    return current_app.response_class(body, mimetype='application/json')
 
 
-# Initialize the database and start the Flask app
+# Start the Flask development server.
+# In production, serve wsgi:app with gunicorn (see gunicorn.conf.py).
 if __name__ == "__main__":
-    try:
-        client.admin.command('ping')  # Check MongoDB connection
-        print("Connected to MongoDB")
-        load_data()  # Load Nobel Prize data into MongoDB on startup
-        app.run(host="0.0.0.0", port=4000, debug=True)
-    except ConnectionFailure as e:
-        print(f"Could not connect to MongoDB: {e}")
+    app = create_app()
+    app.run(host="0.0.0.0", port=4000, debug=True)
@@ -0,0 +1,163 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+from pymongo import monitoring
+
+slow_query_log = logging.getLogger("nobel.slow_query")
+
+REQUESTS = Counter(
+    "nobel_http_requests_total", "HTTP requests handled", ["route", "method", "status"])
+REQUEST_LATENCY = Histogram(
+    "nobel_http_request_duration_seconds", "HTTP request latency (time to first byte)", ["route"])
+STAGE_LATENCY = Histogram(
+    "nobel_stage_duration_seconds", "Time spent in each stage of a request", ["route", "stage"],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5))
+RATE_LIMITED = Counter(
+    "nobel_rate_limited_total", "Requests rejected by the rate limiter", ["route"])
+SEARCH_ERRORS = Counter(
+    "nobel_search_errors_total", "Searches that failed with an error", ["kind"])
+CACHE_EVENTS = Counter(
+    "nobel_cache_events_total", "Response cache lookups by outcome "
+    "(local_hits, redis_hits, misses, shared_loads, redis_errors)", ["event"])
+MONGO_CHECKED_OUT = Gauge(
+    "nobel_mongo_pool_checked_out", "MongoDB connections currently checked out of the pool",
+    multiprocess_mode="livesum")
+MONGO_CONNECTIONS = Gauge(
+    "nobel_mongo_pool_connections", "Open MongoDB connections", multiprocess_mode="livesum")
+MONGO_CHECKOUT_FAILURES = Counter(
+    "nobel_mongo_pool_checkout_failures_total", "Failed MongoDB connection checkouts", ["reason"])
+
+# Route label of the request being handled, also seen by batch worker threads
+# that run with a copy of the request's context
+current_route = contextvars.ContextVar("current_route", default="none")
+
+
+# Time a named stage of the current request
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(current_route.get(), name).observe(time.perf_counter() - start)
+
+
+# Record request counts, latency and rate-limiter rejections for an app
+def init_app(app):
+    def before():
+        current_route.set(request.url_rule.rule if request.url_rule is not None else "unmatched")
+        g.request_started = time.perf_counter()
+
+    def after(response):
+        route = current_route.get()
+        started = g.get("request_started")
+        if started is not None:
+            REQUEST_LATENCY.labels(route).observe(time.perf_counter() - started)
+        REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+        if response.status_code == 429:
+            RATE_LIMITED.labels(route).inc()
+        return response
+
+    app.before_request(before)
+    app.after_request(after)
+
+
+# Metrics in the Prometheus text format. With PROMETHEUS_MULTIPROC_DIR set
+# (multi-worker gunicorn) the values of every worker are aggregated.
+def render_latest():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# Tracks MongoDB pool usage
+class PoolListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_CONNECTIONS.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_CONNECTIONS.dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        MONGO_CHECKOUT_FAILURES.labels(str(event.reason)).inc()
+
+    def connection_checked_out(self, event):
+        MONGO_CHECKED_OUT.inc()
+
+    def connection_checked_in(self, event):
+        MONGO_CHECKED_OUT.dec()
+
+
+# Replace the values in a MongoDB command with "?" so queries that differ
+# only in their parameters log the same shape
+def query_shape(value):
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [query_shape(item) for item in value[:1]]
+    return "?"
+
+
+# Logs MongoDB commands slower than threshold_ms with their query shape
+class SlowQueryListener(monitoring.CommandListener):
+    SHAPED_FIELDS = ("filter", "pipeline", "sort", "projection", "updates")
+
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        command = event.command
+        shape = {field: query_shape(command[field]) for field in self.SHAPED_FIELDS if field in command}
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = shape
+
+    def _finish(self, event, outcome):
+        with self._lock:
+            shape = self._started.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= self.threshold_ms:
+            slow_query_log.warning("Slow MongoDB %s (%s) on %s: %.1f ms, shape=%s",
+                                   event.command_name, outcome, current_route.get(), duration_ms, shape)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "failed")
+
+
+# Listeners to pass to MongoClient(event_listeners=...)
+def mongo_listeners(config):
+    listeners = [PoolListener()]
+    if config.get('SLOW_QUERY_MS'):
+        listeners.append(SlowQueryListener(config['SLOW_QUERY_MS']))
+    return listeners
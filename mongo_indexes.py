@@ -0,0 +1,42 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+# Allowed sort_by values for /search/category and the MongoDB sort each maps
+# to. Every sort ends on _id so keyset pagination has a total order, and each
+# one is served by the category_year_id index (forwards or backwards).
+SORT_FIELDS = {
+    "year": [("year", ASCENDING), ("_id", ASCENDING)],
+    "-year": [("year", DESCENDING), ("_id", DESCENDING)],
+}
+
+# Indexes the app relies on
+REQUIRED_INDEXES = [
+    # Upsert key used by the data loader
+    {"name": "year_category", "keys": [("year", ASCENDING), ("category", ASCENDING)], "unique": True},
+    # Category search: equality on category, then sorted/keyset-paged by year
+    {"name": "category_year_id", "keys": [("category", ASCENDING), ("year", ASCENDING), ("_id", ASCENDING)],
+     "unique": False},
+]
+
+
+# Create any missing required index. Runs in every worker, so an existing
+# index on the same keys is never dropped, even when its name or options
+# differ; that is only reported. Returns the names created.
+def ensure_indexes(collection):
+    existing = {tuple(index["key"].items()): index for index in collection.list_indexes()}
+    created = []
+    for spec in REQUIRED_INDEXES:
+        index = existing.get(tuple(spec["keys"]))
+        if index is not None:
+            if index["name"] != spec["name"] or bool(index.get("unique")) != spec["unique"]:
+                print(f"Warning: MongoDB index {index['name']} differs from the expected {spec['name']} "
+                      f"(unique={spec['unique']}); leaving it as is")
+            continue
+        try:
+            collection.create_index(spec["keys"], name=spec["name"], unique=spec["unique"])
+            created.append(spec["name"])
+        except OperationFailure as e:
+            print(f"Error creating index {spec['name']}: {e}")
+    if created:
+        print(f"Created MongoDB indexes: {', '.join(created)}")
+    return created
@@ -0,0 +1,129 @@
+import bisect
+import math
+import re
+from collections import defaultdict
+
+from laureate_table import LaureateTable
+from serialization import parse_fields, project
+
+_TOKEN = re.compile(r"\w+")
+
+# Score multiplier for terms that only match a query term as a prefix
+PREFIX_WEIGHT = 0.5
+
+# Fields returned when none are requested
+RESULT_FIELDS = parse_fields("_id,year,category,laureates")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+# Immutable snapshot of the inverted index, swapped in atomically on rebuild.
+# Postings, lengths and positions refer to positions of the laureate table.
+class _Postings:
+    __slots__ = ("table", "postings", "vocabulary", "lengths", "average_length", "positions")
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else LaureateTable()
+        self.postings = {}
+        self.vocabulary = []
+        self.lengths = {}
+        self.average_length = 0.0
+        self.positions = []
+
+
+# In-process inverted index over laureates.motivation with BM25 ranking
+class MotivationIndex:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = _Postings()
+
+    def __len__(self):
+        return len(self._postings.positions)
+
+    # Build the index from a laureate table (once per data change). Only
+    # laureates with a motivation are indexed.
+    def build(self, table):
+        index = _Postings(table)
+        postings = defaultdict(dict)
+        for position, laureate in enumerate(table.laureates):
+            terms = tokenize(laureate.get("motivation") or "")
+            if not terms:
+                continue
+            for term in terms:
+                postings[term][position] = postings[term].get(position, 0) + 1
+            index.lengths[position] = len(terms)
+            index.positions.append(position)
+
+        index.postings = dict(postings)
+        index.vocabulary = sorted(postings)
+        if index.positions:
+            index.average_length = sum(index.lengths.values()) / len(index.positions)
+        self._postings = index
+        return len(index.positions)
+
+    def _expand(self, index, term):
+        vocabulary = index.vocabulary
+        start = bisect.bisect_left(vocabulary, term)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(term):
+            end += 1
+        return vocabulary[start:end]
+
+    def _score_term(self, index, term, weight, scores):
+        documents = index.postings[term]
+        count = len(index.positions)
+        idf = math.log(1 + (count - len(documents) + 0.5) / (len(documents) + 0.5))
+        for position, frequency in documents.items():
+            norm = 1 - self.b + self.b * index.lengths[position] / index.average_length
+            score = weight * idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+            if score > scores.get(position, 0.0):
+                scores[position] = score
+
+    # Rank documents matching every query term (each term also matches as a
+    # prefix). Returns (position, score) pairs, best first.
+    def match(self, query, prefix=True):
+        return self._match(self._postings, query, prefix)
+
+    def _match(self, index, query, prefix):
+        terms = tokenize(query)
+        if not terms:
+            return [(position, 0.0) for position in index.positions]
+
+        totals = None
+        for term in dict.fromkeys(terms):
+            scores = {}
+            if term in index.postings:
+                self._score_term(index, term, 1.0, scores)
+            if prefix:
+                for expanded in self._expand(index, term):
+                    if expanded != term:
+                        self._score_term(index, expanded, PREFIX_WEIGHT, scores)
+            if not scores:
+                return []
+            if totals is None:
+                totals = scores
+            else:
+                totals = {position: totals[position] + score
+                          for position, score in scores.items() if position in totals}
+                if not totals:
+                    return []
+
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+    # Search and return (total, documents) for one page of results, projected
+    # to the given fields tree (see serialization.parse_fields)
+    def search(self, query, page=1, page_size=10, prefix=True, fields=None):
+        total, documents = self.iter_search(query, (page - 1) * page_size, page_size, prefix, fields)
+        return total, list(documents)
+
+    # Like search, but returns (total, iterator) that projects each document
+    # only as it is consumed. page_size=None runs to the last match.
+    def iter_search(self, query, start=0, page_size=None, prefix=True, fields=None):
+        index = self._postings
+        ranked = self._match(index, query, prefix)
+        stop = None if page_size is None else start + page_size
+        fields = RESULT_FIELDS if fields is None else fields
+        return len(ranked), (project(index.table.document(position), fields) for position, _ in ranked[start:stop])
@@ -0,0 +1,219 @@
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import redis
+
+from metrics import CACHE_EVENTS, stage
+from serialization import dumps
+
+# One-byte header in front of every value stored in Redis
+_PLAIN = b"\x00"
+_ZLIB = b"\x01"
+
+
+# Collapse whitespace and case so equivalent queries share a cache entry
+def normalize_query(value):
+    return " ".join(str(value).split()).lower()
+
+
+# Cache key from a prefix and parameter values. Parts are used as given:
+# callers normalize free-text queries, while opaque values such as keyset
+# cursors are case-sensitive and must stay distinct.
+def make_key(prefix, *parts):
+    return ":".join([prefix] + [str(part) for part in parts])
+
+
+# Render a result once into the bytes that are sent to the client
+def render(value):
+    with stage("serialization"):
+        return dumps(value)
+
+
+def _glob_escape(value):
+    return "".join("\\" + char if char in "*?[]\\" else char for char in value)
+
+
+def encode(body, compress_min_size):
+    if compress_min_size is not None and len(body) >= compress_min_size:
+        return _ZLIB + zlib.compress(body)
+    return _PLAIN + body
+
+
+def decode(value):
+    if value[:1] == _ZLIB:
+        return zlib.decompress(value[1:])
+    return value[1:]
+
+
+# Bounded in-process LRU tier with a per-entry TTL
+class LocalCache:
+    def __init__(self, max_size=1024, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self, prefixes=None):
+        with self._lock:
+            if prefixes is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key.startswith(tuple(prefixes))]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# A load in progress that concurrent callers for the same key wait on
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.body = None
+        self.error = None
+
+
+# Two-tier (local LRU + Redis) cache of pre-rendered JSON response bodies
+class ResponseCache:
+    def __init__(self, client, ttl=300, local_size=1024, local_ttl=30, compress_min_size=1024):
+        self.client = client
+        self.ttl = ttl
+        self.compress_min_size = compress_min_size
+        self.local = LocalCache(local_size, local_ttl)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "shared_loads": 0, "redis_errors": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+        CACHE_EVENTS.labels(name).inc()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["local_hits"] + stats["redis_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        stats["local_entries"] = len(self.local)
+        return stats
+
+    def _redis_get(self, key):
+        try:
+            with stage("cache_lookup"):
+                value = self.client.get(key)
+        except redis.RedisError:
+            self._count("redis_errors")
+            return None
+        return decode(value) if value else None
+
+    def _redis_set(self, key, body):
+        try:
+            self.client.set(key, encode(body, self.compress_min_size), ex=self.ttl)
+        except redis.RedisError:
+            self._count("redis_errors")
+
+    # Drop every entry whose key starts with one of the prefixes from both tiers
+    def invalidate(self, *prefixes):
+        self.local.clear(prefixes)
+        deleted = 0
+        try:
+            for prefix in prefixes:
+                keys = list(self.client.scan_iter(match=_glob_escape(prefix) + "*", count=500))
+                for start in range(0, len(keys), 500):
+                    deleted += self.client.delete(*keys[start:start + 500])
+        except redis.RedisError:
+            self._count("redis_errors")
+        return deleted
+
+    # Look up several keys at once: the local tier first, then one Redis MGET
+    # for the rest. Returns {key: body} for the keys that were found.
+    def get_many(self, keys):
+        found = {}
+        remaining = []
+        for key in keys:
+            body = self.local.get(key)
+            if body is None:
+                remaining.append(key)
+            else:
+                self._count("local_hits")
+                found[key] = body
+        if not remaining:
+            return found
+
+        try:
+            with stage("cache_lookup"):
+                values = self.client.mget(remaining)
+        except redis.RedisError:
+            self._count("redis_errors")
+            return found
+        for key, value in zip(remaining, values):
+            if value:
+                self._count("redis_hits")
+                found[key] = body = decode(value)
+                self.local.set(key, body)
+        return found
+
+    # Return the rendered body for key, calling loader() at most once per key
+    # across concurrent callers when neither tier has it. With lookup=False
+    # the caller has already missed both tiers and the lookup is skipped.
+    def get_or_load(self, key, loader, lookup=True):
+        body = self.local.get(key) if lookup else None
+        if body is not None:
+            self._count("local_hits")
+            return body
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._count("shared_loads")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.body
+
+        try:
+            body = self._redis_get(key) if lookup else None
+            if body is not None:
+                self._count("redis_hits")
+            else:
+                self._count("misses")
+                body = render(loader())
+                self._redis_set(key, body)
+            self.local.set(key, body)
+            flight.body = body
+            return body
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
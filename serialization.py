@@ -0,0 +1,92 @@
+import json
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+# Fields that can be requested with fields=
+ALLOWED_FIELDS = {
+    "_id", "year", "category", "overallMotivation", "laureates",
+    "laureates.id", "laureates.firstname", "laureates.surname", "laureates.motivation", "laureates.share",
+}
+
+
+# JSON encoder that writes ObjectIds as strings, so documents from MongoDB can
+# be serialized directly without first copying them
+class MongoJSONEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        return super().default(o)
+
+
+# Same ObjectId handling for Flask's jsonify
+class MongoJSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+
+_encoder = MongoJSONEncoder(separators=(",", ":"))
+
+
+def dumps(value):
+    return _encoder.encode(value).encode("utf-8")
+
+
+# Parse a comma-separated fields= value into a projection tree, e.g.
+# "year,laureates.firstname" -> {"year": None, "laureates": {"firstname": None}}
+# where None means "the whole value". Returns None when no fields are given.
+def parse_fields(value):
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError("fields must be a comma-separated string")
+    paths = [path.strip() for path in value.split(",") if path.strip()]
+    unknown = sorted(set(paths) - ALLOWED_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    tree = {}
+    for path in sorted(paths, key=lambda path: path.count(".")):
+        node = tree
+        *parents, leaf = path.split(".")
+        for name in parents:
+            if node.get(name, {}) is None:
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+# Canonical string form of a projection tree, for cache keys
+def fields_key(tree):
+    if tree is None:
+        return "*"
+    return ",".join(sorted(_paths(tree)))
+
+
+def _paths(tree, prefix=""):
+    for name, subtree in tree.items():
+        if subtree is None:
+            yield prefix + name
+        else:
+            yield from _paths(subtree, f"{prefix}{name}.")
+
+
+# MongoDB projection for a projection tree
+def mongo_projection(tree):
+    return {path: 1 for path in _paths(tree)}
+
+
+# Apply a projection tree to a document (None keeps the whole document)
+def project(value, tree):
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {name: project(value[name], subtree) for name, subtree in tree.items() if name in value}
+    return value
@@ -0,0 +1,133 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import redis
+from pymongo import MongoClient
+
+import metrics
+from laureate_index import LaureateIndex
+from laureate_table import LaureateTable
+from motivation_index import MotivationIndex
+from response_cache import ResponseCache
+
+
+# MongoDB client with a bounded connection pool, reporting pool usage (and
+# optionally slow queries) to metrics. connect=False defers the first
+# connection until the client is used.
+def create_mongo_client(config):
+    return MongoClient(
+        host=config['MONGO_HOST'],
+        port=config['MONGO_PORT'],
+        maxPoolSize=config['MONGO_MAX_POOL_SIZE'],
+        minPoolSize=config['MONGO_MIN_POOL_SIZE'],
+        connectTimeoutMS=config['MONGO_CONNECT_TIMEOUT_MS'],
+        socketTimeoutMS=config['MONGO_SOCKET_TIMEOUT_MS'],
+        serverSelectionTimeoutMS=config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        event_listeners=metrics.mongo_listeners(config),
+        connect=False,
+    )
+
+
+# Redis client with a bounded connection pool
+def create_redis_client(config):
+    pool = redis.ConnectionPool(
+        host=config['REDIS_HOST'],
+        port=config['REDIS_PORT'],
+        db=config['REDIS_DB'],
+        max_connections=config['REDIS_MAX_CONNECTIONS'],
+        socket_timeout=config['REDIS_SOCKET_TIMEOUT'],
+        socket_connect_timeout=config['REDIS_CONNECT_TIMEOUT'],
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+# Per-process handles to MongoDB, Redis, the response cache and the in-memory
+# indexes. Clients are created on first use in each process, so a worker
+# forked from a preloaded app never shares its parent's sockets. Clients
+# passed in explicitly are used as-is.
+class Services:
+    def __init__(self, config, mongo_client=None, redis_client=None):
+        self.config = config
+        self.name_index = LaureateIndex()
+        self.motivation_index = MotivationIndex()
+        self._injected_mongo = mongo_client
+        self._injected_redis = redis_client
+        self._mongo_client = None
+        self._redis_client = None
+        self._response_cache = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        # Version of the data the indexes were built from, and of the data
+        # they are being rebuilt from (see ingest.py)
+        self.data_version = 0
+        self.building_version = None
+        self.version_checked_at = 0.0
+
+    def _connect(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            config = self.config
+            self._mongo_client = self._injected_mongo or create_mongo_client(config)
+            self._redis_client = self._injected_redis or create_redis_client(config)
+            self._response_cache = ResponseCache(
+                self._redis_client,
+                ttl=config['CACHE_TTL'],
+                local_size=config['CACHE_LOCAL_SIZE'],
+                local_ttl=config['CACHE_LOCAL_TTL'],
+                compress_min_size=config['CACHE_COMPRESS_MIN_SIZE'],
+            )
+            self._executor = ThreadPoolExecutor(max_workers=config['BATCH_WORKERS'], thread_name_prefix="batch")
+            self._pid = os.getpid()
+
+    @property
+    def mongo_client(self):
+        self._connect()
+        return self._mongo_client
+
+    @property
+    def collection(self):
+        return self.mongo_client[self.config['MONGO_DB']]['prizes']
+
+    @property
+    def redis(self):
+        self._connect()
+        return self._redis_client
+
+    @property
+    def response_cache(self):
+        self._connect()
+        return self._response_cache
+
+    # Thread pool that batch searches fan their cache misses out to
+    @property
+    def executor(self):
+        self._connect()
+        return self._executor
+
+    # (Re)build the in-memory search indexes from MongoDB. Both are built from
+    # one scan and share the same laureate table.
+    def build_indexes(self):
+        try:
+            table = LaureateTable.load(self.collection)
+            count = self.name_index.build(table)
+            print(f"Indexed {count} laureates for name search.")
+            count = self.motivation_index.build(table)
+            print(f"Indexed {count} motivations for motivation search.")
+        except Exception as e:
+            print(f"Error building indexes: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                if self._injected_mongo is None:
+                    self._mongo_client.close()
+                if self._injected_redis is None:
+                    self._redis_client.connection_pool.disconnect()
+                self._executor.shutdown(wait=False)
+            self._pid = None
@@ -0,0 +1,67 @@
+import json
+import time
+
+import fakeredis
+import mongomock
+import pytest
+
+from main import create_app
+
+TEST_CONFIG = {
+    'MONGO_DB': 'nobel_test',
+    'INGEST_ON_START': False,
+    'RATELIMIT_ENABLED': False,
+    # Workers only see a new data version when a test says so
+    'DATA_VERSION_CHECK_INTERVAL': 3600,
+}
+
+
+def prize(year, category, *laureates):
+    return {"year": year, "category": category, "laureates": [
+        {"id": str(i), "firstname": firstname, "surname": surname, "motivation": motivation}
+        for i, (firstname, surname, motivation) in enumerate(laureates)]}
+
+
+# A few real prizes, loaded into apps through the ingest path
+PRIZES = [
+    prize("1903", "physics", ("Marie", "Curie", "in recognition of their joint researches on radiation")),
+    prize("1911", "chemistry", ("Marie", "Curie", "for the discovery of the elements radium and polonium")),
+    prize("1921", "physics", ("Albert", "Einstein", "for his services to theoretical physics")),
+]
+
+
+def write_source(path, prizes):
+    path.write_text(json.dumps({"prizes": prizes}), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def mongo():
+    return mongomock.MongoClient()
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+# Build apps that share one MongoDB and Redis, like the workers of a deployment
+@pytest.fixture
+def make_app(mongo, redis_client):
+    def make(build=True, **config):
+        return create_app(dict(TEST_CONFIG, **config), mongo_client=mongo, redis_client=redis_client, build=build)
+    return make
+
+
+@pytest.fixture
+def source(tmp_path):
+    return write_source(tmp_path / "prizes.json", PRIZES)
+
+
+# Wait (briefly) for a background thread to make condition() true
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
@@ -0,0 +1,40 @@
+import fakeredis
+import mongomock
+
+from main import create_app
+from services import Services
+from tests.conftest import TEST_CONFIG, wait_for
+
+
+def test_create_app(make_app, source):
+    app = make_app(DATA_SOURCE=source, INGEST_ON_START=True)
+    services = app.extensions['nobel']
+    client = app.test_client()
+    assert client.get("/").get_json() == {"message": "Welcome to the Nobel Prize Search API!"}
+    assert client.get("/cache/stats").get_json()["hit_ratio"] == 0.0
+
+    wait_for(lambda: len(services.name_index) == 3)
+    assert services.collection.count_documents({}) == 3
+
+
+def test_apps_are_independent(mongo):
+    first = create_app(TEST_CONFIG, mongo_client=mongo, redis_client=fakeredis.FakeRedis(), build=False)
+    second = create_app(dict(TEST_CONFIG, MONGO_DB='other'), mongo_client=mongo,
+                        redis_client=fakeredis.FakeRedis(), build=False)
+    assert first.extensions['nobel'] is not second.extensions['nobel']
+    assert second.extensions['nobel'].collection.name == "prizes"
+    assert second.extensions['nobel'].collection.database.name == "other"
+
+
+# After a fork the services build a new cache and thread pool, but clients
+# passed in are reused and never closed
+def test_services_reconnect_after_fork(make_app):
+    services = Services(dict(make_app(build=False).config), mongomock.MongoClient(), fakeredis.FakeRedis())
+    cache, executor = services.response_cache, services.executor
+    assert services.response_cache is cache
+
+    services._pid = -1
+    assert services.response_cache is not cache
+    assert services.executor is not executor
+    services.close()
+    assert services.redis.ping()
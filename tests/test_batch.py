@@ -0,0 +1,54 @@
+from ingest import run_ingest
+
+
+def post_batch(app, queries):
+    response = app.test_client().post("/search/batch", json={"queries": queries})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["query"] for result in results] == queries
+    return results
+
+
+def test_batch_runs_each_query(make_app, source):
+    app = make_app()
+    run_ingest(app.extensions['nobel'], source)
+    client = app.test_client()
+    queries = [
+        {"type": "name", "q": "einstein"},
+        {"type": "category", "q": "physics", "page_size": 1},
+        {"type": "motivation", "q": "radium"},
+        {"type": "name", "q": "einstein"},
+    ]
+    results = post_batch(app, queries)
+    assert results[0]["result"] == client.get("/search/name?q=einstein").get_json()
+    assert results[1]["result"] == client.get("/search/category?q=physics&page_size=1").get_json()
+    assert results[2]["result"] == client.get("/search/motivation?q=radium").get_json()
+    assert results[3] == results[0]
+
+
+# Invalid queries get their own error entry and the valid ones still run
+def test_batch_isolates_errors(make_app, source):
+    app = make_app()
+    run_ingest(app.extensions['nobel'], source)
+    queries = [
+        {"type": "category", "q": "physics", "page": None},
+        {"type": "name", "q": "curie", "fields": ["year"]},
+        {"type": "motivation", "q": "radium", "page_size": "ten"},
+        {"type": "name", "q": None},
+        {"type": "category", "q": "physics", "after": 3},
+        {"type": "unknown"},
+        {"type": ["name"]},
+        {"type": {}},
+        "not an object",
+        {"type": "name", "q": "einstein", "fields": "year"},
+    ]
+    results = post_batch(app, queries)
+    assert all("error" in result for result in results[:-1])
+    assert results[-1]["result"][0] == {"year": "1921"}
+
+
+def test_batch_rejects_bad_bodies(make_app):
+    client = make_app(build=False, BATCH_MAX_QUERIES=2).test_client()
+    assert client.post("/search/batch", json={"queries": []}).status_code == 400
+    assert client.post("/search/batch", json=[{"type": "name"}]).status_code == 400
+    assert client.post("/search/batch", json={"queries": [{"type": "name", "q": "a"}] * 3}).status_code == 400
@@ -0,0 +1,31 @@
+import json
+
+from bench.dataset import REAL_PRIZES, generate_prizes, write_dataset
+from bench.load import regressions
+from ingest import iter_prizes, read_chunks
+
+
+def test_generate_prizes_is_deterministic():
+    prizes = list(generate_prizes(0.5, seed=7))
+    assert len(prizes) == int(REAL_PRIZES * 0.5)
+    assert prizes == list(generate_prizes(0.5, seed=7))
+    assert prizes != list(generate_prizes(0.5, seed=8))
+    assert len({(prize["year"], prize["category"]) for prize in prizes}) == len(prizes)
+
+
+def test_written_dataset_loads(tmp_path):
+    path = str(tmp_path / "prizes.json")
+    write_dataset(path, scale=0.2, seed=7)
+    assert list(iter_prizes(read_chunks(path, chunk_size=97))) == list(generate_prizes(0.2, seed=7))
+    with open(path) as handle:
+        assert len(json.load(handle)["prizes"]) == int(REAL_PRIZES * 0.2)
+
+
+def test_regressions():
+    baseline = {"name/cold": {"p99_ms": 10.0, "throughput_rps": 100.0},
+                "name/warm": {"p99_ms": 1.0, "throughput_rps": 1000.0}}
+    results = {"name/cold": {"p99_ms": 12.0, "throughput_rps": 90.0},
+               "name/warm": {"p99_ms": 2.0, "throughput_rps": 500.0},
+               "batch/cold": {"p99_ms": 50.0, "throughput_rps": 1.0}}
+    assert regressions(results, baseline, 0.25) == [
+        "name/warm: p99 1.00 -> 2.00 ms", "name/warm: throughput 1000 -> 500 req/s"]
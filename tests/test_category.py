@@ -0,0 +1,86 @@
+import base64
+import json
+
+import pytest
+from bson import ObjectId
+
+from main import decode_cursor, encode_cursor
+from mongo_indexes import ensure_indexes
+
+
+@pytest.fixture
+def physics(mongo):
+    # Repeated years, so paging also depends on the _id tiebreak
+    docs = [{"_id": ObjectId(), "year": str(1950 + i // 3), "category": "physics", "laureates": []}
+            for i in range(23)]
+    mongo.nobel_test.prizes.insert_many(docs + [{"year": "1950", "category": "peace", "laureates": []}])
+    return docs
+
+
+def token(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("sort_by", ["year", "-year"])
+def test_keyset_walk(make_app, physics, sort_by):
+    client = make_app(build=False).test_client()
+    url = f"/search/category?q=physics&page_size=4&sort_by={sort_by}&fields=_id,year"
+    seen = []
+    body = client.get(url).get_json()
+    while True:
+        assert body["total"] == 23
+        seen.extend(body["results"])
+        if not body["next"]:
+            break
+        body = client.get(f"{url}&after={body['next']}").get_json()
+
+    expected = sorted(physics, key=lambda doc: (doc["year"], doc["_id"]), reverse=sort_by == "-year")
+    assert [doc["_id"] for doc in seen] == [str(doc["_id"]) for doc in expected]
+
+
+def test_numbered_pages_match_keyset_pages(make_app, physics):
+    client = make_app(build=False).test_client()
+    first = client.get("/search/category?q=physics&page_size=5&sort_by=-year").get_json()
+    second = client.get("/search/category?q=physics&page=2&page_size=5&sort_by=-year").get_json()
+    after = client.get(f"/search/category?q=physics&page_size=5&sort_by=-year&after={first['next']}").get_json()
+    assert after["results"] == second["results"]
+
+
+def test_cursor_round_trip():
+    doc = {"_id": ObjectId(), "year": "1903"}
+    assert decode_cursor(encode_cursor(doc)) == ("1903", doc["_id"])
+
+
+@pytest.mark.parametrize("value", [
+    "not-a-cursor",
+    token(["1903"]),
+    token(["1903", "not-an-object-id"]),
+    token([{"$exists": True}, str(ObjectId())]),
+    token([["1903"], str(ObjectId())]),
+    token([True, str(ObjectId())]),
+])
+def test_invalid_cursors(make_app, physics, value):
+    with pytest.raises(ValueError):
+        decode_cursor(value)
+    response = make_app(build=False).test_client().get(f"/search/category?q=physics&after={value}")
+    assert response.status_code == 400
+
+
+def test_invalid_parameters(make_app):
+    client = make_app(build=False).test_client()
+    for query in ("sort_by=name", "page=0", "page_size=-1", "page=abc"):
+        assert client.get(f"/search/category?q=physics&{query}").status_code == 400
+
+
+def test_ensure_indexes(mongo):
+    collection = mongo.db.prizes
+    assert ensure_indexes(collection) == ["year_category", "category_year_id"]
+    assert ensure_indexes(collection) == []
+
+
+# An operator's index on the same keys is reported, never dropped
+def test_ensure_indexes_keeps_existing_index(mongo):
+    collection = mongo.db.prizes
+    collection.create_index([("year", 1), ("category", 1)], name="custom")
+    assert ensure_indexes(collection) == ["category_year_id"]
+    assert "custom" in collection.index_information()
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from ingest import VERSION_KEY, affected_cache_prefixes, ingest, iter_prizes, run_ingest
+from mongo_indexes import ensure_indexes
+from tests.conftest import PRIZES as SAMPLE, prize, wait_for, write_source
+
+PRIZES = [
+    prize("1903", "physics", ("Marie", "Skłodowska-Curie", 'for "radiation", research ]}')),
+    {"year": "1904", "category": "peace", "overallMotivation": "", "laureates": []},
+    prize("1921", "physics", ("Albert", "Einstein", "for the photoelectric effect\n")),
+]
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_iter_prizes_across_chunk_boundaries(size):
+    data = json.dumps({"meta": {"prizes": 0}, "prizes": PRIZES}, indent=1, ensure_ascii=False).encode("utf-8")
+    assert list(iter_prizes(chunked(data, size))) == PRIZES
+
+
+def test_iter_prizes_empty_array():
+    assert list(iter_prizes([b'{"prizes": [ ]}'])) == []
+
+
+def test_iter_prizes_without_array():
+    with pytest.raises(ValueError):
+        list(iter_prizes([b'{"laureates": []}']))
+
+
+def test_iter_prizes_truncated():
+    data = json.dumps({"prizes": PRIZES}).encode("utf-8")
+    with pytest.raises(ValueError):
+        list(iter_prizes(chunked(data[:-40], 16)))
+
+
+def test_ingest_detects_changes(mongo):
+    collection = mongo.db.prizes
+    first = ingest(collection, PRIZES, batch_size=2)
+    assert (first.inserted, first.updated, first.unchanged) == (3, 0, 0)
+
+    changed = [prize("1903", "physics", ("Maria", "Skłodowska-Curie", "for radiation"))] + PRIZES[1:]
+    second = ingest(collection, changed, batch_size=2)
+    assert (second.inserted, second.updated, second.unchanged) == (0, 1, 2)
+    assert second.categories == {"physics"}
+    assert collection.count_documents({}) == 3
+    assert collection.find_one({"year": "1903"})["laureates"][0]["firstname"] == "Maria"
+    assert "category:physics:" in affected_cache_prefixes(second)
+
+
+# Another worker writing after the snapshot of existing prizes was taken
+# must not fail the load
+def test_ingest_with_stale_snapshot(mongo):
+    collection = mongo.db.prizes
+    ensure_indexes(collection)
+
+    def prizes():
+        collection.insert_one(dict(PRIZES[0]))
+        yield from PRIZES
+
+    result = ingest(collection, prizes())
+    assert result.seen == 3
+    assert collection.count_documents({}) == 3
+
+
+def test_run_ingest_invalidates_category_cache(make_app, source, tmp_path):
+    app = make_app()
+    run_ingest(app.extensions['nobel'], source)
+    client = app.test_client()
+    assert client.get("/search/category?q=physics").get_json()["total"] == 2
+
+    write_source(tmp_path / "prizes.json", SAMPLE + [prize("1922", "physics", ("Niels", "Bohr", "for atoms"))])
+    run_ingest(app.extensions['nobel'], source)
+    assert client.get("/search/category?q=physics").get_json()["total"] == 3
+
+
+# A worker that has not rebuilt yet must not cache results from its old
+# indexes where up-to-date workers will read them
+def test_lagging_worker_does_not_serve_stale_index(make_app, redis_client, source, tmp_path):
+    loader = make_app()
+    run_ingest(loader.extensions['nobel'], source)
+    lagging = make_app()
+    lagging.extensions['nobel'].version_checked_at = float("inf")
+
+    renamed = [prize("1921", "physics", ("Albert", "Einsteyn", "for his services to theoretical physics"))]
+    write_source(tmp_path / "prizes.json", SAMPLE[:2] + renamed)
+    run_ingest(loader.extensions['nobel'], source)
+
+    def first_surname(app):
+        return app.test_client().get("/search/name?q=albert").get_json()[0]["laureates"]["surname"]
+
+    assert first_surname(lagging) == "Einstein"
+    assert first_surname(loader) == "Einsteyn"
+
+    # Once it notices the new version the lagging worker catches up
+    lagging.extensions['nobel'].version_checked_at = float("-inf")
+    lagging.test_client().get("/")
+    version = int(redis_client.get(VERSION_KEY))
+    wait_for(lambda: lagging.extensions['nobel'].data_version == version)
+    assert first_surname(lagging) == "Einsteyn"
+
+
+# The request that notices a new data version is answered normally while the
+# indexes are rebuilt in the background
+def test_version_bump_does_not_fail_requests(make_app, redis_client, source):
+    app = make_app(DATA_VERSION_CHECK_INTERVAL=0)
+    run_ingest(app.extensions['nobel'], source)
+    client = app.test_client()
+    assert client.get("/search/name?q=curie").status_code == 200
+
+    redis_client.incr(VERSION_KEY)
+    for _ in range(3):
+        assert client.get("/search/name?q=curie").status_code == 200
+    version = int(redis_client.get(VERSION_KEY))
+    wait_for(lambda: app.extensions['nobel'].data_version == version)
@@ -0,0 +1,76 @@
+import pytest
+
+from laureate_index import LaureateIndex
+from laureate_table import LaureateTable
+from serialization import parse_fields
+from tests.conftest import prize
+
+
+@pytest.fixture
+def collection(mongo):
+    collection = mongo.db.prizes
+    collection.insert_many([
+        prize("1903", "physics", ("Marie", "Curie", "radiation"), ("Pierre", "Curie", "radiation")),
+        prize("1911", "chemistry", ("Marie", "Curie", "radium")),
+        {"year": "1916", "category": "literature", "laureates": []},
+        prize("1921", "physics", ("Albert", "Einstein", "theoretical physics")),
+        dict(prize("1964", "peace", ("Martin Luther", "King Jr.", "nonviolence")), overallMotivation="civil rights"),
+    ])
+    return collection
+
+
+@pytest.fixture
+def index(collection):
+    index = LaureateIndex()
+    index.build(LaureateTable.load(collection))
+    return index
+
+
+def unwound(collection):
+    documents = collection.aggregate([{"$unwind": "$laureates"}, {"$project": {"_hash": 0}}])
+    return [dict(document) for document in documents]
+
+
+def test_table_documents_match_unwind(collection):
+    table = LaureateTable.load(collection)
+    assert len(table) == 5
+    assert len(table.prizes) == 4
+    assert table.prize_refs.tolist() == [0, 0, 1, 2, 3]
+    assert [table.document(position) for position in range(len(table))] == unwound(collection)
+
+
+def test_full_name_match(index):
+    results = index.search("Pierre Curie")
+    assert (results[0]["year"], results[0]["laureates"]["firstname"]) == ("1903", "Pierre")
+
+
+def test_surname_match(index):
+    assert index.search("einstein")[0]["laureates"]["surname"] == "Einstein"
+    assert index.search("King")[0]["laureates"]["firstname"] == "Martin Luther"
+
+
+# A repeated name is scored once but found at every position it occurs
+def test_repeated_names_map_back_to_every_position(index):
+    results = index.search("Marie Curie", limit=2)
+    assert sorted(result["year"] for result in results) == ["1903", "1911"]
+    assert all(result["laureates"]["firstname"] == "Marie" for result in results)
+
+
+def test_search_many_matches_search(index):
+    queries = ["curie", "einstien", "martin king", ""]
+    fields = [None, parse_fields("year"), None, None]
+    assert index.search_many(queries, 3, fields) == [index.search(query, 3, tree) for query, tree in zip(queries, fields)]
+    assert index.search("") == []
+
+
+def test_results_are_copies(index):
+    index.search("einstein")[0]["laureates"] = None
+    assert index.search("einstein")[0]["laureates"]["surname"] == "Einstein"
+
+
+def test_empty_index(mongo):
+    index = LaureateIndex()
+    assert index.search("curie") == []
+    index.build(LaureateTable.load(mongo.db.empty))
+    assert len(index) == 0
+    assert index.search_many(["curie", "bohr"]) == [[], []]
@@ -0,0 +1,77 @@
+import logging
+from types import SimpleNamespace
+
+from prometheus_client import REGISTRY
+
+from ingest import run_ingest
+from metrics import SlowQueryListener, query_shape
+
+
+# Metrics live in the global registry, so tests compare before and after
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint(make_app):
+    response = make_app(build=False).test_client().get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert b"nobel_http_requests_total" in response.get_data()
+
+
+def test_request_and_stage_metrics(make_app, source):
+    app = make_app()
+    run_ingest(app.extensions['nobel'], source)
+    client = app.test_client()
+    route = "/search/name"
+    requests = sample("nobel_http_requests_total", route=route, method="GET", status="200")
+    matches = sample("nobel_stage_duration_seconds_count", route=route, stage="fuzzy_match")
+    misses = sample("nobel_cache_events_total", event="misses")
+
+    client.get("/search/name?q=curie")
+    client.get("/search/name?q=curie")
+    assert sample("nobel_http_requests_total", route=route, method="GET", status="200") == requests + 2
+    assert sample("nobel_stage_duration_seconds_count", route=route, stage="fuzzy_match") == matches + 1
+    assert sample("nobel_cache_events_total", event="misses") == misses + 1
+    assert sample("nobel_http_request_duration_seconds_count", route=route) >= requests + 2
+
+
+# Batch misses run on the thread pool but are still attributed to the batch route
+def test_batch_stages_use_the_batch_route(make_app, source):
+    app = make_app()
+    run_ingest(app.extensions['nobel'], source)
+    before = sample("nobel_stage_duration_seconds_count", route="/search/batch", stage="mongo_query")
+    app.test_client().post("/search/batch", json={"queries": [{"type": "category", "q": "physics", "page": 7}]})
+    assert sample("nobel_stage_duration_seconds_count", route="/search/batch", stage="mongo_query") > before
+
+
+def test_rate_limited_requests_are_counted(make_app):
+    client = make_app(build=False, RATELIMIT_ENABLED=True).test_client()
+    before = sample("nobel_rate_limited_total", route="/search/category")
+    statuses = [client.get("/search/category?q=physics").status_code for _ in range(11)]
+    assert 429 in statuses
+    assert sample("nobel_rate_limited_total", route="/search/category") == before + statuses.count(429)
+
+
+def test_query_shape():
+    command = {"category": "physics", "$or": [{"year": {"$gt": "1903"}}, {"year": "1903"}], "limit": 11}
+    assert query_shape(command) == {"category": "?", "$or": [{"year": {"$gt": "?"}}], "limit": "?"}
+
+
+def test_slow_query_listener(caplog):
+    listener = SlowQueryListener(threshold_ms=10)
+
+    def run(request_id, micros):
+        event = SimpleNamespace(connection_id=("db", 27017), request_id=request_id, command_name="find",
+                                command={"find": "prizes", "filter": {"category": "physics"}},
+                                duration_micros=micros)
+        listener.started(event)
+        listener.succeeded(event)
+
+    with caplog.at_level(logging.WARNING, logger="nobel.slow_query"):
+        run(1, 2000)
+        run(2, 25000)
+    assert len(caplog.records) == 1
+    assert "25.0 ms" in caplog.records[0].getMessage()
+    assert "{'filter': {'category': '?'}}" in caplog.records[0].getMessage()
+    assert listener._started == {}
@@ -0,0 +1,78 @@
+import pytest
+
+from ingest import run_ingest
+from laureate_table import LaureateTable
+from motivation_index import MotivationIndex, tokenize
+from tests.conftest import prize
+
+
+@pytest.fixture
+def index(mongo):
+    collection = mongo.db.prizes
+    collection.insert_many([
+        prize("1901", "physics", ("A", "One", "for the discovery of rays")),
+        prize("1902", "physics", ("B", "Two", "rays rays rays")),
+        prize("1903", "physics", ("C", "Three", "for work on radiation and the theory of rays in a long motivation")),
+        prize("1904", "chemistry", ("D", "Four", "for radioactive decay")),
+        prize("1905", "peace", ("E", "Five", None), ("F", "Six", "for (peace) [.*] a+b")),
+        prize("1906", "physics", ("G", "Seven", "for the ray")),
+    ])
+    index = MotivationIndex()
+    index.build(LaureateTable.load(collection))
+    return index
+
+
+def years(results):
+    return [result["year"] for result in results[1]]
+
+
+def test_tokenize():
+    assert tokenize("For the Discovery of X-rays!") == ["for", "the", "discovery", "of", "x", "rays"]
+
+
+def test_bm25_ranks_frequent_terms_in_short_motivations_first(index):
+    assert years(index.search("rays")) == ["1902", "1901", "1903"]
+
+
+def test_every_term_must_match(index):
+    assert years(index.search("rays discovery")) == ["1901"]
+    assert index.search("rays decay") == (0, [])
+
+
+def test_prefix_matching(index):
+    assert years(index.search("radi")) == ["1904", "1903"]
+    assert index.search("radi", prefix=False) == (0, [])
+    assert years(index.search("radiation", prefix=False)) == ["1903"]
+    # A whole-word match ranks above prefix-only ones
+    assert years(index.search("ray")) == ["1906", "1902", "1901", "1903"]
+    assert years(index.search("ray", prefix=False)) == ["1906"]
+
+
+def test_queries_are_literal(index):
+    assert years(index.search("(peace) [.*]")) == ["1905"]
+    assert index.search(".*") == (6, index.search("")[1])
+
+
+def test_paging(index):
+    total, page = index.search("rays", page=2, page_size=2)
+    assert total == 3
+    assert [result["year"] for result in page] == ["1903"]
+    total, documents = index.iter_search("rays", 1)
+    assert (total, [document["year"] for document in documents]) == (3, ["1901", "1903"])
+
+
+def test_results_keep_their_fields(index):
+    result = index.search("decay")[1][0]
+    assert set(result) == {"_id", "year", "category", "laureates"}
+    assert result["laureates"]["surname"] == "Four"
+
+
+def test_motivation_endpoint(make_app, source):
+    app = make_app()
+    run_ingest(app.extensions['nobel'], source)
+    client = app.test_client()
+    body = client.get("/search/motivation?q=r&page_size=1").get_json()
+    assert body["total"] == 2
+    assert len(body["results"]) == 1
+    assert client.get("/search/motivation?q=r&prefix=false").get_json() == {"results": [], "total": 0}
+    assert client.get("/search/motivation?q=r&page=0").status_code == 400
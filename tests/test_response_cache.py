@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from response_cache import LocalCache, ResponseCache, decode, encode, make_key, normalize_query
+from tests.conftest import wait_for
+
+
+def test_get_or_load_caches_in_both_tiers(redis_client):
+    cache = ResponseCache(redis_client)
+    assert cache.get_or_load("name:0:curie", lambda: [1]) == b"[1]"
+    assert cache.local.get("name:0:curie") == b"[1]"
+    assert cache.get_or_load("name:0:curie", lambda: [2]) == b"[1]"
+
+    other_worker = ResponseCache(redis_client)
+    assert other_worker.get_or_load("name:0:curie", lambda: [3]) == b"[1]"
+    assert other_worker.stats()["redis_hits"] == 1
+    assert 0 < redis_client.ttl("name:0:curie") <= cache.ttl
+
+
+def test_get_or_load_single_flight(redis_client):
+    cache = ResponseCache(redis_client)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"ok": True}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", load))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    try:
+        wait_for(lambda: cache.stats()["shared_loads"] == 3)
+    finally:
+        release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == [b'{"ok":true}'] * 4
+
+
+# A failed load is not cached
+def test_get_or_load_errors(redis_client):
+    cache = ResponseCache(redis_client)
+
+    def load():
+        raise RuntimeError("boom")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="boom"):
+            cache.get_or_load("key", load)
+    assert cache.get_or_load("key", lambda: []) == b"[]"
+
+
+def test_invalidate_by_prefix(redis_client):
+    cache = ResponseCache(redis_client, compress_min_size=1)
+    for key in ("category:physics:1", "category:peace:1", "category:physics*:1"):
+        cache.get_or_load(key, lambda: "x" * 100)
+
+    assert cache.invalidate("category:physics:") == 1
+    assert cache.get_many(["category:physics:1", "category:peace:1", "category:physics*:1"]).keys() == {
+        "category:peace:1", "category:physics*:1"}
+    assert redis_client.get("category:physics:1") is None
+
+
+def test_local_cache_evicts_and_expires():
+    cache = LocalCache(max_size=2, ttl=30)
+    for key in "abc":
+        cache.set(key, key.encode())
+    assert (cache.get("a"), cache.get("c")) == (None, b"c")
+    expired = LocalCache(ttl=-1)
+    expired.set("a", b"a")
+    assert expired.get("a") is None
+
+
+def test_encode_round_trip():
+    body = b'{"results":[]}' * 100
+    assert decode(encode(body, 1024)) == body
+    assert len(encode(body, 1024)) < len(body)
+    assert encode(b"[]", 1024) == b"\x00[]"
+
+
+def test_make_key_keeps_opaque_parts():
+    assert normalize_query("  Marie   CURIE ") == "marie curie"
+    assert make_key("category", "physics", "WzE5MDMsImFiIl0", 10) == "category:physics:WzE5MDMsImFiIl0:10"
+    assert make_key("category", "physics", "wzE5MDMsImFiIl0", 10) != make_key("category", "physics", "WzE5MDMsImFiIl0", 10)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from bson import ObjectId
+
+from ingest import run_ingest
+from serialization import dumps, fields_key, mongo_projection, parse_fields, project
+
+
+def test_dumps_writes_object_ids_as_strings():
+    object_id = ObjectId()
+    assert json.loads(dumps({"_id": object_id, "ids": [object_id]})) == {"_id": str(object_id), "ids": [str(object_id)]}
+
+
+def test_parse_fields():
+    tree = parse_fields("year, laureates.firstname,laureates.surname")
+    assert tree == {"year": None, "laureates": {"firstname": None, "surname": None}}
+    assert parse_fields("laureates.id,laureates") == {"laureates": None}
+    assert fields_key(tree) == "laureates.firstname,laureates.surname,year"
+    assert fields_key(parse_fields("laureates.surname,year,laureates.firstname")) == fields_key(tree)
+    assert mongo_projection(tree) == {"year": 1, "laureates.firstname": 1, "laureates.surname": 1}
+    assert parse_fields("") is None
+
+
+@pytest.mark.parametrize("value", ["password", "year,laureates.born", ["year"]])
+def test_parse_fields_rejects(value):
+    with pytest.raises(ValueError):
+        parse_fields(value)
+
+
+def test_project():
+    doc = {"year": "1903", "category": "physics",
+           "laureates": [{"firstname": "Marie", "surname": "Curie"}, {"firstname": "Pierre"}]}
+    tree = parse_fields("year,laureates.surname")
+    assert project(doc, tree) == {"year": "1903", "laureates": [{"surname": "Curie"}, {}]}
+    assert project(doc, None) is doc
+
+
+@pytest.fixture
+def client(make_app, source):
+    app = make_app()
+    run_ingest(app.extensions['nobel'], source)
+    return app.test_client()
+
+
+def test_fields_projection(client):
+    assert client.get("/search/name?q=einstein&fields=year,laureates.surname").get_json()[0] == {
+        "year": "1921", "laureates": {"surname": "Einstein"}}
+    assert client.get("/search/category?q=physics&fields=year").get_json()["results"] == [
+        {"year": "1903"}, {"year": "1921"}]
+    assert client.get("/search/motivation?q=radium&fields=category").get_json()["results"] == [
+        {"category": "chemistry"}]
+    assert client.get("/search/name?q=einstein&fields=born").status_code == 400
+
+
+def test_ndjson_stream(client):
+    response = client.get("/search/category?q=physics&fields=year&format=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["X-Total-Count"] == "2"
+    assert [json.loads(line) for line in response.get_data().splitlines()] == [{"year": "1903"}, {"year": "1921"}]
+
+    response = client.get("/search/motivation?q=r&page_size=1&fields=year&format=ndjson")
+    assert response.headers["X-Total-Count"] == "2"
+    assert len(response.get_data().splitlines()) == 1
+
+    response = client.get("/search/name?q=curie&fields=year&format=ndjson")
+    assert {json.loads(line)["year"] for line in response.get_data().splitlines()} >= {"1903", "1911"}
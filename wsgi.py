@@ -0,0 +1,6 @@
+# WSGI entry point for production servers, e.g. `gunicorn -c gunicorn.conf.py wsgi:app`.
+# With preload_app off (the default) each worker imports this module after the
+# fork and so builds its own app, clients and indexes.
+from main import create_app
+
+app = create_app()